@@ -1,8 +1,9 @@
+import asyncio
 import json
 import os
 import pandas as pd
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List
 
 def clean_raw_data(input_path: str, output_path: str) -> None:
     """
@@ -35,6 +36,26 @@ def clean_raw_data(input_path: str, output_path: str) -> None:
 
     print(f"Initial raw data size: {len(df)} records.")
 
+    df_clean = _clean_frame(df)
+    
+    print(f"Data size after cleaning and filtering: {len(df_clean)} records.")
+    
+    df_clean.to_csv(output_path, index=False)
+    
+    print(f"Saved {len(df_clean)} cleaned records to {output_path}")
+
+
+def _clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the cleaning filters and feature engineering to a DataFrame of
+    raw records and returns only the final output columns.
+
+    Args:
+        df (pd.DataFrame): Raw records, one row per game.
+
+    Returns:
+        pd.DataFrame: The cleaned records (possibly empty).
+    """
     MIN_REVIEWS = 50 
     
     df_clean = (df
@@ -43,8 +64,15 @@ def clean_raw_data(input_path: str, output_path: str) -> None:
     )
     df_clean = df_clean[df_clean['total_reviews'] >= MIN_REVIEWS]
     
-    print(f"Data size after cleaning and filtering: {len(df_clean)} records.")
-    
+    final_cols = [
+        'app_id', 'name', 
+        'original_price_usd', 'current_price_usd', 'is_free', 
+        'owners_proxy', 'total_reviews', 'review_ratio',
+        'days_since_release', 'main_genre', 'release_date'
+    ]
+
+    if df_clean.empty:
+        return pd.DataFrame(columns=final_cols)
     
     df_clean['original_price_usd'] = df_clean['original_price_cents'] / 100
     df_clean['current_price_usd'] = df_clean['current_price_cents'] / 100
@@ -55,9 +83,12 @@ def clean_raw_data(input_path: str, output_path: str) -> None:
     snapshot_dt = datetime.fromisoformat(snapshot_time_str.replace('Z', '+00:00')).replace(tzinfo=None)
     df_clean['release_dt'] = pd.to_datetime(df_clean['release_date'], errors='coerce')
     
+    # Nullable integer dtype, so a chunk with an unparseable release date
+    # does not turn the whole column into floats in the CSV.
     df_clean['days_since_release'] = (
         (snapshot_dt - df_clean['release_dt'])
         .dt.days
+        .astype('Int64')
     )
     
     df_clean['main_genre'] = df_clean['genres'].apply(
@@ -66,17 +97,61 @@ def clean_raw_data(input_path: str, output_path: str) -> None:
     
     df_clean['is_free'] = df_clean['is_free'].astype(int)
 
-    
-    final_cols = [
-        'app_id', 'name', 
-        'original_price_usd', 'current_price_usd', 'is_free', 
-        'owners_proxy', 'total_reviews', 'review_ratio',
-        'days_since_release', 'main_genre', 'release_date'
-    ]
-    
-    df_clean[final_cols].to_csv(output_path, index=False)
-    
-    print(f"Saved {len(df_clean)} cleaned records to {output_path}")
+    return df_clean[final_cols]
+
+
+async def clean_raw_stream(
+    rows: AsyncIterator[Dict[str, Any]],
+    output_path: str,
+    chunk_size: int = 50,
+) -> None:
+    """
+    Consumes raw game records from an async iterator while they are still
+    being collected, cleans them in chunks of chunk_size records and
+    appends each cleaned chunk to a CSV file.
+
+    Args:
+        rows (AsyncIterator[Dict[str, Any]]): Raw records, e.g. drained
+            from the queue filled by fetch_filtered_games.
+        output_path (str): The path where the cleaned CSV data will be
+            saved. The file is overwritten by the first chunk.
+        chunk_size (int): Number of raw records cleaned per chunk.
+
+    Returns:
+        None: The result is saved directly to a file.
+    """
+    buffer: List[Dict[str, Any]] = []
+    n_raw = 0
+    n_clean = 0
+
+    # Runs in a worker thread so that the pandas work does not block the
+    # event loop the collector is running on.
+    def flush(chunk: List[Dict[str, Any]], first: bool) -> int:
+        df_clean = _clean_frame(pd.DataFrame(chunk))
+        df_clean.to_csv(
+            output_path,
+            mode='w' if first else 'a',
+            header=first,
+            index=False,
+        )
+        return len(df_clean)
+
+    async for row in rows:
+        buffer.append(row)
+        n_raw += 1
+        if len(buffer) >= chunk_size:
+            n_clean += await asyncio.to_thread(flush, buffer, n_clean == 0)
+            buffer = []
+
+    if buffer:
+        n_clean += await asyncio.to_thread(flush, buffer, n_clean == 0)
+
+    if n_raw == 0:
+        print("Warning: No raw records were received. Cannot perform cleaning.")
+        return
+
+    print(f"Initial raw data size: {n_raw} records.")
+    print(f"Saved {n_clean} cleaned records to {output_path}")
 
 
 if __name__ == "__main__":
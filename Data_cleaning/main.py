@@ -1,22 +1,63 @@
 # main.py
 
+import asyncio
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from Data_cleaning.clean_data import clean_raw_data 
+from Data_cleaning.clean_data import clean_raw_data, clean_raw_stream
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
 RAW_DATA_PATH = os.path.join(BASE_DIR, "Data_collection", "Rawdata", "games_filtered.json")
 CLEAN_DATA_PATH = os.path.join(BASE_DIR, "Data_cleaning", "data", "processed", "games_clean.csv")
 
+
+async def pipeline(config: tuple) -> None:
+    """
+    Runs collection and cleaning concurrently: fetch_filtered_games puts
+    each selected record on a queue while the cleaning coroutine drains
+    it and appends cleaned chunks to the CSV file.
+
+    Args:
+        config (tuple): Compact configuration tuple, in the format
+            accepted by parse_filter_config.
+    """
+    # Imported here so that cleaning an existing file does not require
+    # the Steam API key that fetch_raw_data checks at import time.
+    from Data_collection.fetch_raw_data import fetch_filtered_games, parse_filter_config
+
+    params = parse_filter_config(config)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def rows():
+        while True:
+            row = await queue.get()
+            if row is None:
+                return
+            yield row
+
+    await asyncio.gather(
+        fetch_filtered_games(output_path=RAW_DATA_PATH, row_queue=queue, **params),
+        clean_raw_stream(rows(), CLEAN_DATA_PATH),
+    )
+
+
 if __name__ == "__main__":
-    
+
     os.makedirs(os.path.dirname(CLEAN_DATA_PATH), exist_ok=True)
 
     os.makedirs(os.path.dirname(RAW_DATA_PATH), exist_ok=True)
 
-    print("\n--- Cleaning and Feature Engineering ---")
-    clean_raw_data(RAW_DATA_PATH, CLEAN_DATA_PATH)
-    
+    if len(sys.argv) > 1:
+        # e.g. python main.py '(500, 0, 0, 0, "", 0)'; an optional 7th
+        # element of 0 skips SteamSpy in random mode.
+        from Data_collection.fetch_raw_data import parse_tuple_input, run_async
+        config = parse_tuple_input(sys.argv[1])
+
+        print("\n--- Collecting, Cleaning and Feature Engineering ---")
+        run_async(pipeline(config))
+    else:
+        print("\n--- Cleaning and Feature Engineering ---")
+        clean_raw_data(RAW_DATA_PATH, CLEAN_DATA_PATH)
+
     print("\n--- Complete ---")
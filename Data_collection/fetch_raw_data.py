@@ -1,86 +1,573 @@
-import json
+import ast
+import asyncio
+import functools
+import heapq
+import tempfile
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+import weakref
+from urllib.parse import urlsplit
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Coroutine, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypeVar
 import os
 import random
 import re
+import sys
 
-import requests
+import aiohttp
+import orjson
+import pandas as pd
 from dotenv import load_dotenv
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
 load_dotenv()
 
+STEAM_API_KEY: str = os.environ.get("STEAM_API_KEY") or ""
+if not STEAM_API_KEY:
+    raise RuntimeError("STEAM_API_KEY not set (add it to the environment or .env)")
+
 APPLIST_URL = "https://api.steampowered.com/IStoreService/GetAppList/v1/"
 STEAM_APPDETAILS_URL = "https://store.steampowered.com/api/appdetails"
 STEAM_APPREVIEWS_URL = "https://store.steampowered.com/appreviews/"
 STEAMSPY_URL = "https://steamspy.com/api.php"
 
+MAX_CONCURRENCY = 8
+RATE_LIMIT_CALLS = 40
+RATE_LIMIT_PERIOD = 1.0
+# Request budgets (max_calls, period in seconds) for hosts whose published
+# limits are stricter than RATE_LIMIT_CALLS per RATE_LIMIT_PERIOD: the
+# Storefront allows about 200 requests per 5 minutes, and SteamSpy asks
+# for at most one request per second.
+HOST_RATE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "store.steampowered.com": (200, 300.0),
+    "steamspy.com": (1, 1.0),
+}
+MAX_RETRY_AFTER = 60.0
+MAX_ATTEMPTS = 4
+APPDETAILS_BATCH_SIZE = 20
+
+_YEAR_RE = re.compile(r"(\d{4})")
+_OWNERS_RE = re.compile(r"\s*(\d[\d,]*)\s*\.\.\s*(\d[\d,]*)")
+
+# appdetails fields kept in the cache and in raw_appdetails; the rest of
+# the Storefront payload (descriptions, screenshots, requirements, ...)
+# is dropped as soon as it is parsed.
+_APPDETAILS_KEEP = (
+    "name",
+    "release_date",
+    "genres",
+    "price_overview",
+    "is_free",
+    "type",
+    "categories",
+    "developers",
+    "publishers",
+)
+
+HTTP_HEADERS = {"User-Agent": "What_consist_a_good_game data collector"}
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+APPDETAILS_CACHE_TTL = 24 * 3600
+APPREVIEWS_CACHE_TTL = 6 * 3600
+STEAMSPY_CACHE_TTL = 24 * 3600
+
+
+def _cache_path(namespace: str, app_id: int) -> str:
+    return os.path.join(CACHE_DIR, namespace, f"{app_id}.json")
+
+
+def _cache_read(namespace: str, app_id: int) -> Optional[Tuple[float, Dict[str, Any]]]:
+    '''
+    Read the cache entry for (namespace, app_id) regardless of its age.
+    Return (age_in_seconds, entry), or None if there is no usable entry.
+    '''
+    path = _cache_path(namespace, app_id)
+    try:
+        age = time.time() - os.stat(path).st_mtime
+        with open(path, "rb") as f:
+            entry = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    return age, entry
+
+
+def _cache_load(namespace: str, app_id: int, ttl: float) -> Tuple[bool, Any]:
+    '''
+    Look up a cached response for (namespace, app_id). Return (True, value)
+    if a cache file exists and is younger than ttl seconds, otherwise
+    (False, None).
+    '''
+    cached = _cache_read(namespace, app_id)
+    if cached is None or cached[0] >= ttl:
+        return False, None
+
+    return True, cached[1].get("payload")
+
+
+def _cache_store(
+    namespace: str,
+    app_id: int,
+    value: Any,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> None:
+    '''
+    Persist value under (namespace, app_id), together with the ETag and
+    Last-Modified validators of the response it came from, if any. The
+    file is written to a temporary name first and moved into place with
+    os.replace, so a concurrent reader never sees a partially written
+    entry.
+    '''
+    path = _cache_path(namespace, app_id)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    entry = {
+        "_cached_at": time.time(),
+        "etag": etag,
+        "last_modified": last_modified,
+        "payload": value,
+    }
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(entry))
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@dataclass(slots=True, frozen=True)
+class JSONResponse:
+    '''
+    Outcome of a _fetch_json call: the HTTP status (None if no response
+    was received), the decoded body (None unless the status is 200 and
+    the body is valid JSON), and the response's ETag / Last-Modified
+    validators.
+    '''
+    status: Optional[int] = None
+    payload: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+    '''
+    Build If-None-Match / If-Modified-Since headers from the validators
+    stored in a cache entry.
+    '''
+    headers: Dict[str, str] = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+_V = TypeVar("_V")
+_CachedFetcher = Callable[
+    [aiohttp.ClientSession, int, Dict[str, str]],
+    Coroutine[Any, Any, Tuple[_V, JSONResponse]],
+]
+
+
+def disk_cache(
+    namespace: str,
+    ttl: float,
+) -> Callable[[_CachedFetcher[_V]], Callable[[aiohttp.ClientSession, int], Coroutine[Any, Any, _V]]]:
+    '''
+    Decorate an async fetcher with signature (session, app_id, headers)
+    returning (value, response) so that the value obtained from a 200
+    response is stored on disk under CACHE_DIR/namespace and reused for
+    ttl seconds without issuing a network request. None values (e.g. an
+    app that is not a game) are cached too; failed requests are not. The
+    decorated function has signature (session, app_id) and returns only
+    the value.
+
+    Once an entry is older than ttl, the fetcher is given the stored
+    ETag / Last-Modified as conditional request headers; a 304 response
+    refreshes the entry and returns the cached payload.
+    '''
+    def decorator(
+        fn: _CachedFetcher[_V],
+    ) -> Callable[[aiohttp.ClientSession, int], Coroutine[Any, Any, _V]]:
+        @functools.wraps(fn)
+        async def wrapper(session: aiohttp.ClientSession, app_id: int) -> _V:
+            hit, value = _cache_load(namespace, app_id, ttl)
+            if hit:
+                return value
+
+            stale = _cache_read(namespace, app_id)
+            stale_entry = stale[1] if stale is not None else None
+            headers = _conditional_headers(stale_entry) if stale_entry else {}
+
+            value, resp = await fn(session, app_id, headers)
+
+            if resp.status == 304 and stale_entry is not None:
+                value = stale_entry.get("payload")
+                _cache_store(
+                    namespace, app_id, value,
+                    resp.etag or stale_entry.get("etag"),
+                    resp.last_modified or stale_entry.get("last_modified"),
+                )
+            elif resp.status == 200:
+                _cache_store(namespace, app_id, value, resp.etag, resp.last_modified)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+class TransientHTTPError(Exception):
+    '''
+    Raised for responses that are worth retrying (429 and 5xx). Carries
+    the delay requested by the server's Retry-After header, if any.
+    '''
+
+    def __init__(self, status: int, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    '''
+    Async context manager that bounds both the number of in-flight
+    requests (max_concurrent) and the request rate, allowing at most
+    max_calls request starts in any sliding window of period seconds.
+    '''
+
+    def __init__(self, max_concurrent: int, max_calls: int, period: float) -> None:
+        self._sem = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._max_calls = max_calls
+        self._period = period
+        self._starts: Deque[float] = deque()
+
+    async def _wait_for_slot(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._starts and now - self._starts[0] >= self._period:
+                    self._starts.popleft()
+                if len(self._starts) < self._max_calls:
+                    self._starts.append(now)
+                    return
+                await asyncio.sleep(self._period - (now - self._starts[0]))
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self._sem.acquire()
+        try:
+            await self._wait_for_slot()
+        except BaseException:
+            self._sem.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._sem.release()
+
+
+_limiters: "weakref.WeakKeyDictionary[aiohttp.ClientSession, Dict[str, RateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Sessions for which the Storefront has rejected a multi-id appdetails
+# request; later batches on them are fetched one id at a time directly.
+_batch_rejected: "weakref.WeakSet[aiohttp.ClientSession]" = weakref.WeakSet()
+
+
+def _limiter_for(session: aiohttp.ClientSession, url: str) -> RateLimiter:
+    '''
+    Return the rate limiter shared by all requests made through session
+    to the host of url, creating it on first use. The budget comes from
+    HOST_RATE_LIMITS, or RATE_LIMIT_CALLS per RATE_LIMIT_PERIOD for other
+    hosts.
+    '''
+    host = urlsplit(url).hostname or ""
+    by_host = _limiters.setdefault(session, {})
+    limiter = by_host.get(host)
+    if limiter is None:
+        max_calls, period = HOST_RATE_LIMITS.get(host, (RATE_LIMIT_CALLS, RATE_LIMIT_PERIOD))
+        limiter = RateLimiter(MAX_CONCURRENCY, max_calls, period)
+        by_host[host] = limiter
+    return limiter
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+_backoff = wait_exponential_jitter(initial=0.5, max=8)
 
-def get_app_list(max_results: int = 1000) -> List[Dict[str, Any]]:
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    '''
+    Wait for the server-requested Retry-After delay (capped at
+    MAX_RETRY_AFTER seconds) when one was sent, otherwise back off
+    exponentially with jitter.
+    '''
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, TransientHTTPError) and exc.retry_after is not None:
+        return min(exc.retry_after, MAX_RETRY_AFTER)
+    return _backoff(retry_state)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    '''
+    Decide whether a failed request is worth retrying: 429/5xx responses,
+    connection errors and timeouts are; other 4xx responses are not.
+    '''
+    if isinstance(exc, TransientHTTPError):
+        return True
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+_retry_transient = retry(
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    wait=_retry_wait,
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+
+
+@_retry_transient
+async def _get_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: Dict[str, Any],
+    headers: Optional[Dict[str, str]],
+) -> JSONResponse:
+    '''
+    Perform one rate-limited GET attempt for _fetch_json. Raise
+    TransientHTTPError on 429/5xx so the attempt is retried. A body that
+    is not valid JSON is reported and gives a None payload.
+    '''
+    async with _limiter_for(session, url):
+        async with session.get(url, params=params, headers=headers or {}) as resp:
+            if resp.status == 429 or resp.status >= 500:
+                raise TransientHTTPError(
+                    resp.status,
+                    _parse_retry_after(resp.headers.get("Retry-After")),
+                )
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            if resp.status != 200:
+                return JSONResponse(resp.status, None, etag, last_modified)
+            body = await resp.read()
+
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        print(f"Invalid JSON from {url}")
+        payload = None
+    return JSONResponse(200, payload, etag, last_modified)
+
+
+async def _fetch_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+) -> JSONResponse:
+    '''
+    Issue a GET request through the shared session and return a
+    JSONResponse with the status, the decoded JSON body (None if the
+    status is not 200) and the response validators.
+
+    Each attempt goes through the session's per-host RateLimiter.
+    Responses with status 429 or 5xx, connection errors and timeouts are
+    retried up to MAX_ATTEMPTS times with jittered exponential backoff
+    (or the Retry-After delay); other statuses such as 400/404 are not
+    retried.
+    If every attempt fails, the error is reported and an empty
+    JSONResponse (status None) is returned.
+
+    headers are sent with every attempt; disk_cache uses them for the
+    If-None-Match / If-Modified-Since validators of a stale entry, in
+    which case a 304 status comes back with a None payload.
+    '''
+    try:
+        return await _get_json(session, url, params, headers)
+    except (TransientHTTPError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Giving up on {url} after {MAX_ATTEMPTS} attempts: {e!r}")
+        return JSONResponse()
+
+
+@_retry_transient
+async def get_app_list(
+    session: aiohttp.ClientSession,
+    max_results: int = 1000,
+) -> List[Dict[str, Any]]:
     '''
     Call the Steam IStoreService/GetAppList endpoint and return
     a list of app records (each record contains at least appid and name).
     The result is limited by max_results.
     '''
-    api_key = os.environ["STEAM_API_KEY"]
-
-    params = {
-        "key": api_key,
-        "include_games": True,
-        "include_dlc": False,
-        "include_software": False,
-        "include_videos": False,
-        "include_hardware": False,
+    params: Dict[str, Any] = {
+        "key": STEAM_API_KEY,
+        "include_games": "true",
+        "include_dlc": "false",
+        "include_software": "false",
+        "include_videos": "false",
+        "include_hardware": "false",
         "max_results": max_results,
     }
 
-    resp = requests.get(APPLIST_URL, params=params, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    async with _limiter_for(session, APPLIST_URL):
+        async with session.get(
+            APPLIST_URL, params=params, timeout=aiohttp.ClientTimeout(total=30)
+        ) as resp:
+            resp.raise_for_status()
+            data = orjson.loads(await resp.read())
 
     apps = data.get("response", {}).get("apps", [])
     return apps
 
 
-def get_sample_app_ids(max_games: int = 300) -> List[int]:
+async def get_sample_app_ids(
+    session: aiohttp.ClientSession,
+    max_games: int = 300,
+) -> List[int]:
     '''
     Use get_app_list to obtain a batch of apps and extract appid values.
     Return at most max_games appids as the sample frame for later calls.
     '''
-    apps = get_app_list(max_results=max_games)
+    apps = await get_app_list(session, max_results=max_games)
     app_ids = [app["appid"] for app in apps if app.get("appid")]
     return app_ids
 
 
-def fetch_app_details(app_id: int) -> Optional[Dict[str, Any]]:
+def _parse_appdetails_entry(entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    '''
+    Extract the data block from one entry of an appdetails response,
+    projected onto the _APPDETAILS_KEEP fields. Return None if the lookup
+    failed or the app is not a "game".
+    '''
+    if not isinstance(entry, dict) or not entry.get("success"):
+        return None
+
+    data = entry.get("data")
+    if not isinstance(data, dict) or data.get("type") != "game":
+        return None
+
+    return {k: data.get(k) for k in _APPDETAILS_KEEP}
+
+
+@disk_cache(namespace="appdetails", ttl=APPDETAILS_CACHE_TTL)
+async def fetch_app_details(
+    session: aiohttp.ClientSession,
+    app_id: int,
+    headers: Dict[str, str],
+) -> Tuple[Optional[Dict[str, Any]], JSONResponse]:
     '''
     Fetch detailed information for a single app from the Storefront
     appdetails endpoint. Only return data if the type is "game".
-    Otherwise return None.
+    Otherwise return None. (headers and the returned JSONResponse are
+    handled by disk_cache; callers pass only session and app_id.)
     '''
     params = {"appids": app_id, "cc": "us", "l": "en"}
-    resp = requests.get(STEAM_APPDETAILS_URL, params=params, timeout=20)
-    if resp.status_code != 200:
-        return None
+    resp = await _fetch_json(session, STEAM_APPDETAILS_URL, params, headers)
+    raw = resp.payload
+    if not isinstance(raw, dict):
+        return None, resp
 
-    raw = resp.json()
-    entry = raw.get(str(app_id))
-    if not entry or not entry.get("success"):
-        return None
+    return _parse_appdetails_entry(raw.get(str(app_id))), resp
 
-    data = entry.get("data", {})
-    if data.get("type") != "game":
-        return None
 
-    return data
+async def fetch_app_details_batch(
+    session: aiohttp.ClientSession,
+    app_ids: List[int],
+) -> Dict[int, Optional[Dict[str, Any]]]:
+    '''
+    Fetch appdetails for several apps with one comma-separated appids
+    request. Return a mapping from app id to its "game" data block, or
+    None for ids that failed or are not games.
+
+    Ids with a fresh entry in the appdetails disk cache (including a
+    cached None for non-games) are answered from the cache, and only the
+    remaining ids go over the network. The
+    Storefront rejects some multi-id requests (typically with a 400), so
+    if the batched call gets an answer without a usable body each id is
+    fetched on its own instead, and so are all later batches on the same
+    session; an id whose single request fails maps to None.
+    '''
+    result: Dict[int, Optional[Dict[str, Any]]] = {}
+    missing: List[int] = []
+    for aid in app_ids:
+        hit, value = _cache_load("appdetails", aid, APPDETAILS_CACHE_TTL)
+        if hit:
+            result[aid] = value
+        else:
+            missing.append(aid)
+
+    if len(missing) == 1 or (missing and session in _batch_rejected):
+        result.update(await _fetch_app_details_each(session, missing))
+    elif missing:
+        params = {"appids": ",".join(str(aid) for aid in missing), "cc": "us", "l": "en"}
+        resp = await _fetch_json(session, STEAM_APPDETAILS_URL, params)
+        raw = resp.payload
+        if isinstance(raw, dict) and raw:
+            for aid in missing:
+                data = _parse_appdetails_entry(raw.get(str(aid)))
+                _cache_store("appdetails", aid, data)
+                result[aid] = data
+        else:
+            if resp.status is not None:
+                print("Storefront rejected a multi-id appdetails request; fetching ids one at a time.")
+                _batch_rejected.add(session)
+            result.update(await _fetch_app_details_each(session, missing))
+
+    return {aid: result[aid] for aid in app_ids}
 
 
-def fetch_review_summary(app_id: int) -> Optional[Dict[str, Any]]:
+async def _fetch_app_details_each(
+    session: aiohttp.ClientSession,
+    app_ids: List[int],
+) -> Dict[int, Optional[Dict[str, Any]]]:
+    '''
+    Fetch appdetails for app_ids concurrently, one request per id. An id
+    whose request raises is reported and maps to None.
+    '''
+    singles = await asyncio.gather(
+        *(fetch_app_details(session, aid) for aid in app_ids),
+        return_exceptions=True,
+    )
+    result: Dict[int, Optional[Dict[str, Any]]] = {}
+    for aid, data in zip(app_ids, singles):
+        if isinstance(data, BaseException):
+            print(f"Error on app_id={aid}: {data}")
+            result[aid] = None
+        else:
+            result[aid] = data
+    return result
+
+
+@disk_cache(namespace="appreviews", ttl=APPREVIEWS_CACHE_TTL)
+async def fetch_review_summary(
+    session: aiohttp.ClientSession,
+    app_id: int,
+    headers: Dict[str, str],
+) -> Tuple[Optional[Dict[str, Any]], JSONResponse]:
     '''
     Fetch aggregated review statistics for a single app from the
     /appreviews endpoint. Return the query_summary block, which
     contains total_reviews and total_positive, or None on failure.
+    (headers and the returned JSONResponse are handled by disk_cache.)
     '''
     params = {
         "json": 1,
@@ -88,92 +575,268 @@ def fetch_review_summary(app_id: int) -> Optional[Dict[str, Any]]:
         "purchase_type": "all",
         "num_per_page": 0,
     }
-    resp = requests.get(f"{STEAM_APPREVIEWS_URL}{app_id}", params=params, timeout=20)
-    if resp.status_code != 200:
-        return None
+    resp = await _fetch_json(session, f"{STEAM_APPREVIEWS_URL}{app_id}", params, headers)
+    data = resp.payload
+    if not isinstance(data, dict):
+        return None, resp
 
-    data = resp.json()
-    return data.get("query_summary")
+    return data.get("query_summary"), resp
 
 
-def fetch_owners_proxy(app_id: int) -> Optional[int]:
+@disk_cache(namespace="steamspy", ttl=STEAMSPY_CACHE_TTL)
+async def fetch_owners_proxy(
+    session: aiohttp.ClientSession,
+    app_id: int,
+    headers: Dict[str, str],
+) -> Tuple[Optional[int], JSONResponse]:
     '''
     Query the SteamSpy appdetails API for a single app and use the
     reported owners range as a proxy for sales. The function returns
     the midpoint of the owners interval as an integer, or None if the
-    value is not available or cannot be parsed.
+    request fails (see _fetch_json) or the value is not available or
+    cannot be parsed. (headers and the returned JSONResponse are
+    handled by disk_cache.)
     '''
     params = {"request": "appdetails", "appid": app_id}
-    try:
-        resp = requests.get(STEAMSPY_URL, params=params, timeout=20)
-        if resp.status_code != 200:
-            return None
+    resp = await _fetch_json(session, STEAMSPY_URL, params, headers)
+    return _parse_owners(resp.payload), resp
 
-        data = resp.json()
-        owners_str = data.get("owners")
-        if not owners_str:
-            return None
 
-        cleaned = owners_str.replace(",", "").replace(" ", "")
-        parts = cleaned.split("..")
-        if len(parts) != 2:
-            return None
+def _parse_owners(data: Any) -> Optional[int]:
+    '''
+    Return the midpoint of the "owners" range of a SteamSpy appdetails
+    response, or None if it is missing or malformed.
+    '''
+    if not isinstance(data, dict):
+        return None
 
-        low = int(parts[0])
-        high = int(parts[1])
-        return (low + high) // 2
+    owners_str = data.get("owners")
+    if not isinstance(owners_str, str):
+        return None
 
-    except (ValueError, TypeError) as e:
-        print(f"SteamSpy parse error for app {app_id}: {e}")
+    m = _OWNERS_RE.match(owners_str)
+    if not m:
         return None
-    except Exception as e:
-        print(f"SteamSpy error for app {app_id}: {e}")
+
+    low = int(m.group(1).replace(",", ""))
+    high = int(m.group(2).replace(",", ""))
+    return (low + high) // 2
+
+
+async def _fetch_app_extras(
+    session: aiohttp.ClientSession,
+    app_id: int,
+) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+    '''
+    Issue the appreviews and SteamSpy requests for one app concurrently
+    and return (reviews, owners_proxy). Request failures already come
+    back as None from _fetch_json; any other exception raised by either
+    call (such as a failed cache write) is reported and turned into None.
+    '''
+    r_task = asyncio.create_task(fetch_review_summary(session, app_id))
+    o_task = asyncio.create_task(fetch_owners_proxy(session, app_id))
+    reviews, owners_proxy = await asyncio.gather(r_task, o_task, return_exceptions=True)
+
+    if isinstance(reviews, BaseException):
+        print(f"Unexpected review summary error for app {app_id}: {reviews!r}")
+        reviews = None
+    if isinstance(owners_proxy, BaseException):
+        print(f"Unexpected SteamSpy error for app {app_id}: {owners_proxy!r}")
+        owners_proxy = None
+
+    return reviews, owners_proxy
+
+
+def _batched(items: List[int], size: int) -> List[List[int]]:
+    '''
+    Split items into consecutive chunks of at most size elements.
+    '''
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _genre_descriptions(genres_raw: List[Dict[str, Any]]) -> List[str]:
+    '''
+    Return the non-empty "description" values of an appdetails genres list.
+    '''
+    out: List[str] = []
+    for g in genres_raw:
+        desc = g.get("description")
+        if desc:
+            out.append(desc)
+    return out
+
+
+def _read_jsonl_header(line: bytes) -> Any:
+    '''
+    Return the run parameters stored in the header line of a JSON Lines
+    file, or None if line is not a valid header.
+    '''
+    try:
+        header = orjson.loads(line)
+    except orjson.JSONDecodeError:
         return None
+    if not isinstance(header, dict):
+        return None
+    return header.get("run")
+
+
+def _resume_jsonl(path: str, run_params: Dict[str, Any]) -> Set[int]:
+    '''
+    Prepare the JSON Lines file of a run and return the app ids already
+    written to it, so they can be skipped.
+
+    The first line of the file is a header holding run_params. A file
+    left behind by an interrupted run is only resumed if its header
+    matches run_params; a trailing partial line (from a crash mid-write)
+    is truncated away. A file written with other parameters, or without
+    a header, is discarded. If no file is resumed, a new one containing
+    only the header is created and an empty set is returned.
+    '''
+    header = orjson.dumps({"run": run_params}) + b"\n"
+    expected = orjson.loads(orjson.dumps(run_params))
+
+    app_ids: Set[int] = set()
+    if os.path.exists(path):
+        with open(path, "rb+") as f:
+            first = f.readline()
+            if first.endswith(b"\n") and _read_jsonl_header(first) == expected:
+                complete_end = len(first)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    complete_end += len(line)
+                    if line.strip():
+                        app_ids.add(orjson.loads(line)["app_id"])
+                f.truncate(complete_end)
+                if app_ids:
+                    print(f"Resuming from {path}: {len(app_ids)} records already written.")
+                return app_ids
+
+        print(f"Discarding {path}: it was written with different run parameters.")
+
+    with open(path, "wb") as f:
+        f.write(header)
+    return app_ids
+
+
+def _iter_jsonl_lines(path: str) -> Iterator[bytes]:
+    '''
+    Yield the records of a JSON Lines file written by this module,
+    skipping its header line.
+    '''
+    with open(path, "rb") as f:
+        next(f, None)
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _write_json_array(lines: Iterable[bytes], output_path: str) -> int:
+    '''
+    Stream already-serialized JSON records into output_path as a JSON
+    list, one record per line. Return the number of records written.
+    '''
+    count = 0
+    with open(output_path, "wb") as f:
+        f.write(b"[")
+        for line in lines:
+            f.write(b",\n" if count else b"\n")
+            f.write(line)
+            count += 1
+        f.write(b"\n]" if count else b"]")
+    return count
+
+
+def _select_jsonl_lines(path: str, app_ids: List[int]) -> List[bytes]:
+    '''
+    Return the records of a JSON Lines file whose app_id is in app_ids,
+    in the order of app_ids. Only the selected lines are kept in memory.
+    '''
+    position = {aid: pos for pos, aid in enumerate(app_ids)}
+    selected: List[Optional[bytes]] = [None] * len(app_ids)
+    for line in _iter_jsonl_lines(path):
+        pos = position.get(orjson.loads(line)["app_id"])
+        if pos is not None:
+            selected[pos] = line
+    return [line for line in selected if line is not None]
 
 
-def fetch_and_save_raw_data(output_path: str, max_games: int = 300) -> None:
+def _new_session() -> aiohttp.ClientSession:
+    '''
+    Build the HTTP session shared by every request of a collection run.
+    A single keep-alive connection pool is reused for all calls to the
+    same host, so the TCP/TLS handshake is paid once per connection
+    instead of once per request.
+    '''
+    connector = aiohttp.TCPConnector(
+        limit=32,
+        limit_per_host=8,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=HTTP_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=20),
+    )
+
+
+async def fetch_and_save_raw_data(output_path: str, max_games: int = 300) -> None:
     '''
     Orchestrate the full data collection pipeline:
     1) sample a set of appids,
-    2) fetch appdetails, review summaries, and owners proxy for each app,
-    3) assemble the fields into a list of dictionaries,
-    4) save the resulting list as a JSON file at output_path.
+    2) fetch appdetails in batches of APPDETAILS_BATCH_SIZE ids, then
+       review summaries and owners proxy for each game; every request
+       goes through the session's per-host RateLimiter,
+    3) append each assembled record to output_path + ".jsonl" as soon as
+       it is complete,
+    4) convert the JSON Lines file into a JSON list at output_path.
+
+    If a JSON Lines file from an interrupted run with the same max_games
+    exists, the app ids it already contains are skipped and new records
+    are appended to it; a file from a run with other parameters is
+    discarded.
     '''
-    snapshot_time = datetime.utcnow().isoformat() + "Z"
+    snapshot_time = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    jsonl_path = output_path + ".jsonl"
+    written_ids = _resume_jsonl(
+        jsonl_path,
+        {"function": "fetch_and_save_raw_data", "max_games": max_games},
+    )
+    done = 0
+
+    async def process_app(
+        session: aiohttp.ClientSession,
+        app_id: int,
+        details: Dict[str, Any],
+    ) -> None:
+        nonlocal done
+        try:
+            rd = details.get("release_date") or {}
+            price = details.get("price_overview") or {}
+            genres_raw = details.get("genres") or []
 
-    app_ids = get_sample_app_ids(max_games=max_games)
-    results: List[Dict[str, Any]] = []
+            reviews, owners_proxy = await _fetch_app_extras(session, app_id)
 
-    for idx, app_id in enumerate(app_ids, start=1):
-        try:
-            details = fetch_app_details(app_id)
-            if not details:
-                continue
+            done += 1
+            if done % 50 == 0:
+                print(f"Fetched {done} apps...")
 
-            reviews = fetch_review_summary(app_id)
             total_reviews = None
             positive_reviews = None
             if reviews:
                 total_reviews = reviews.get("total_reviews")
                 positive_reviews = reviews.get("total_positive")
 
-            owners_proxy = fetch_owners_proxy(app_id)
-
-            price = details.get("price_overview") or {}
-            original_price = price.get("initial")
-            current_price = price.get("final")
-
-            genres = details.get("genres") or []
-            genre_list = [g.get("description") for g in genres if g.get("description")]
-
             row = {
                 "app_id": app_id,
                 "name": details.get("name"),
-                "release_date": details.get("release_date", {}).get("date"),
-                "original_price_cents": original_price,
-                "current_price_cents": current_price,
+                "release_date": rd.get("date"),
+                "original_price_cents": price.get("initial"),
+                "current_price_cents": price.get("final"),
                 "is_free": details.get("is_free"),
-                "genres": genre_list,
+                "genres": _genre_descriptions(genres_raw),
                 "total_reviews": total_reviews,
                 "positive_reviews": positive_reviews,
                 "owners_proxy": owners_proxy,
@@ -182,23 +845,93 @@ def fetch_and_save_raw_data(output_path: str, max_games: int = 300) -> None:
                 "raw_review_summary": reviews,
             }
 
-            results.append(row)
-
-            if idx % 50 == 0:
-                print(f"Fetched {idx} apps...")
-            time.sleep(0.3)
+            sink.write(orjson.dumps(row) + b"\n")
 
         except Exception as e:
             print(f"Error on app_id={app_id}: {e}")
+
+    async def process_batch(
+        session: aiohttp.ClientSession,
+        batch: List[int],
+    ) -> None:
+        try:
+            details_map = await fetch_app_details_batch(session, batch)
+        except Exception as e:
+            print(f"Error on app_ids={batch}: {e}")
+            return
+
+        await asyncio.gather(
+            *(process_app(session, aid, details)
+              for aid, details in details_map.items() if details)
+        )
+
+    with open(jsonl_path, "ab") as sink:
+        async with _new_session() as session:
+            app_ids = await get_sample_app_ids(session, max_games=max_games)
+            app_ids = [aid for aid in app_ids if aid not in written_ids]
+            await asyncio.gather(
+                *(process_batch(session, batch)
+                  for batch in _batched(app_ids, APPDETAILS_BATCH_SIZE))
+            )
+
+    saved = _write_json_array(_iter_jsonl_lines(jsonl_path), output_path)
+    os.remove(jsonl_path)
+
+    print(f"Saved {saved} records to {output_path}")
+
+
+def _filter_details(
+    details_by_id: Mapping[int, Optional[Dict[str, Any]]],
+    min_year: Optional[int],
+    target_main_genre: Optional[str],
+    free_only: Optional[bool],
+) -> List[int]:
+    '''
+    Apply the fetch_filtered_games conditions to a batch of appdetails at
+    once, using vectorized pandas operations, and return the app ids that
+    pass, in their original order.
+    '''
+    records = []
+    for aid, details in details_by_id.items():
+        if not details:
             continue
+        rd = details.get("release_date") or {}
+        genres_raw = details.get("genres") or []
+        records.append({
+            "app_id": aid,
+            "type": details.get("type"),
+            "release_date": rd.get("date"),
+            "genres": _genre_descriptions(genres_raw),
+            "is_free": bool(details.get("is_free")),
+        })
+    if not records:
+        return []
+
+    df = pd.DataFrame.from_records(records)
+    mask = df["type"] == "game"
+
+    if min_year is not None:
+        release_year = pd.to_numeric(
+            df["release_date"].astype("string").str.extract(_YEAR_RE, expand=False),
+            errors="coerce",
+        )
+        mask &= release_year >= min_year
+
+    if target_main_genre is not None:
+        if target_main_genre.lower() == "indie":
+            mask &= df["genres"].explode().eq("Indie").groupby(level=0).any()
+        else:
+            mask &= df["genres"].str[0] == target_main_genre
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    if free_only is True:
+        mask &= df["is_free"]
+    elif free_only is False:
+        mask &= ~df["is_free"]
 
-    print(f"Saved {len(results)} records to {output_path}")
+    return df.loc[mask, "app_id"].tolist()
 
 
-def fetch_filtered_games(
+async def fetch_filtered_games(
     output_path: str,
     target_n: int = 500,
     min_year: Optional[int] = None,
@@ -206,6 +939,8 @@ def fetch_filtered_games(
     free_only: Optional[bool] = None,
     sample_mode: str = "random",
     max_candidates: int = 5000,
+    row_queue: Optional["asyncio.Queue[Optional[Dict[str, Any]]]"] = None,
+    fetch_owners: bool = True,
 ) -> None:
     '''
     Fetch a filtered sample of games based on user-specified conditions
@@ -226,6 +961,10 @@ def fetch_filtered_games(
     - "top": collect games that satisfy the conditions, then rank them
       by popularity and take the top target_n. Popularity is measured
       primarily by owners_proxy, with total_reviews as a secondary key.
+      SteamSpy is queried first for every app id, and a bounded heap
+      keeps the current top target_n; once the heap is full, appdetails
+      and reviews are only fetched for apps whose owners_proxy can still
+      enter it.
 
     max_candidates semantics:
     - -1: no soft upper bound; use a large internal upper bound for the
@@ -234,82 +973,83 @@ def fetch_filtered_games(
     - > 0: soft limit on how many app ids are examined.
     - other values should be handled before this function is called.
 
-    The final selected games are written as a JSON list of records to
-    output_path, using the same schema as fetch_and_save_raw_data.
+    fetch_owners: in "random" mode, owners_proxy is only stored, never
+    used for selection. Passing False skips the SteamSpy request for each
+    game and stores owners_proxy as None. Note that clean_raw_data drops
+    records without owners_proxy. "top" mode always queries SteamSpy.
+
+    App ids are examined in windows of MAX_CONCURRENCY batched appdetails
+    requests. The conditions are checked on the whole window of appdetails
+    data at once (see _filter_details), and only
+    the surviving games trigger the remaining review (and, in "random"
+    mode, SteamSpy) requests. The early stop of the "random" mode is
+    checked after each window.
+
+    Matching games are appended to output_path + ".jsonl" as they are
+    found, and an interrupted run resumes from that file if it was
+    started with the same parameters (otherwise the file is discarded
+    and the run starts over). The final selected games are written as a
+    JSON list of records to output_path, using the same schema as
+    fetch_and_save_raw_data.
+
+    If row_queue is given, every selected record is also put on it, and a
+    final None marks the end of the stream, so a consumer can process the
+    records while collection is still running. In "random" mode records
+    are published as soon as they are found (at most target_n of them);
+    in "top" mode the ranking is only known at the end, so the selected
+    records are published then.
     '''
-    snapshot_time = datetime.utcnow().isoformat() + "Z"
-
-    if max_candidates == -1:
-        app_ids = get_sample_app_ids(max_games=50000)
-    else:
-        app_ids = get_sample_app_ids(max_games=max_candidates)
-
-    if sample_mode == "random":
-        random.shuffle(app_ids)
-
-    candidates: List[Dict[str, Any]] = []
-
-    for idx, app_id in enumerate(app_ids, start=1):
+    snapshot_time = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    jsonl_path = output_path + ".jsonl"
+    written_ids = _resume_jsonl(
+        jsonl_path,
+        {
+            "function": "fetch_filtered_games",
+            "target_n": target_n,
+            "min_year": min_year,
+            "target_main_genre": target_main_genre,
+            "free_only": free_only,
+            "sample_mode": sample_mode,
+            "max_candidates": max_candidates,
+            "fetch_owners": fetch_owners,
+        },
+    )
+
+    owners_by_id: Dict[int, Optional[int]] = {}
+
+    async def evaluate_app(
+        session: aiohttp.ClientSession,
+        app_id: int,
+        details: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
         try:
-            details = fetch_app_details(app_id)
-            if not details:
-                continue
-
-            release_info = details.get("release_date") or {}
-            release_str = release_info.get("date")
-            release_year: Optional[int] = None
-            if release_str:
-                match = re.search(r"(\d{4})", release_str)
-                if match:
-                    try:
-                        release_year = int(match.group(1))
-                    except ValueError:
-                        release_year = None
-
-            if min_year is not None:
-                if release_year is None or release_year < min_year:
-                    continue
-
-            genres = details.get("genres") or []
-            genre_list = [g.get("description") for g in genres if g.get("description")]
-
-            if target_main_genre is not None:
-                if target_main_genre.lower() == "indie":
-                    if "Indie" not in genre_list:
-                        continue
-                else:
-                    main_genre = genre_list[0] if genre_list else None
-                    if main_genre != target_main_genre:
-                        continue
-
-            is_free = details.get("is_free")
+            rd = details.get("release_date") or {}
+            price = details.get("price_overview") or {}
+            genres_raw = details.get("genres") or []
 
-            if free_only is True and not is_free:
-                continue
-            if free_only is False and is_free:
-                continue
+            if sample_mode == "top":
+                reviews = await fetch_review_summary(session, app_id)
+                owners_proxy = owners_by_id.get(app_id)
+            elif fetch_owners:
+                reviews, owners_proxy = await _fetch_app_extras(session, app_id)
+            else:
+                reviews = await fetch_review_summary(session, app_id)
+                owners_proxy = None
 
-            reviews = fetch_review_summary(app_id)
             total_reviews: Optional[int] = None
             positive_reviews: Optional[int] = None
             if reviews:
                 total_reviews = reviews.get("total_reviews")
                 positive_reviews = reviews.get("total_positive")
 
-            owners_proxy = fetch_owners_proxy(app_id)
-
-            price = details.get("price_overview") or {}
-            original_price = price.get("initial")
-            current_price = price.get("final")
-
-            row = {
+            return {
                 "app_id": app_id,
                 "name": details.get("name"),
-                "release_date": release_info.get("date"),
-                "original_price_cents": original_price,
-                "current_price_cents": current_price,
-                "is_free": is_free,
-                "genres": genre_list,
+                "release_date": rd.get("date"),
+                "original_price_cents": price.get("initial"),
+                "current_price_cents": price.get("final"),
+                "is_free": details.get("is_free"),
+                "genres": _genre_descriptions(genres_raw),
                 "total_reviews": total_reviews,
                 "positive_reviews": positive_reviews,
                 "owners_proxy": owners_proxy,
@@ -318,149 +1058,320 @@ def fetch_filtered_games(
                 "raw_review_summary": reviews,
             }
 
-            candidates.append(row)
-
-            if sample_mode == "random" and len(candidates) >= target_n:
-                break
-
         except Exception as e:
             print(f"Error on app_id={app_id}: {e}")
-            continue
+            return None
 
-    if not candidates:
-        print("No games matched the given filters. Nothing will be saved.")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=2)
-        return
+    async def fetch_details(
+        session: aiohttp.ClientSession,
+        batch: List[int],
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        try:
+            return await fetch_app_details_batch(session, batch)
+        except Exception as e:
+            print(f"Error on app_ids={batch}: {e}")
+            return {}
 
-    if sample_mode == "top":
-        def popularity_key(r: Dict[str, Any]) -> Any:
-            owners = r.get("owners_proxy") or 0
-            total = r.get("total_reviews") or 0
-            return (owners, total)
+    try:
+        n_written = len(written_ids)
+        window = MAX_CONCURRENCY * APPDETAILS_BATCH_SIZE
+
+        # Min-heap of (owners_proxy, total_reviews, app_id) holding the
+        # current top target_n for "top" mode; heap[0] is the entry to beat.
+        heap: List[Tuple[int, int, int]] = []
+
+        def push_top(row: Dict[str, Any]) -> None:
+            key = (row.get("owners_proxy") or 0, row.get("total_reviews") or 0, row["app_id"])
+            if len(heap) < target_n:
+                heapq.heappush(heap, key)
+            elif key > heap[0]:
+                heapq.heappushpop(heap, key)
+
+        if sample_mode == "top" and written_ids:
+            for line in _iter_jsonl_lines(jsonl_path):
+                push_top(orjson.loads(line))
+        elif row_queue is not None and written_ids:
+            for line in _iter_jsonl_lines(jsonl_path):
+                row_queue.put_nowait(orjson.loads(line))
+
+        with open(jsonl_path, "ab") as sink:
+            async with _new_session() as session:
+                if max_candidates == -1:
+                    app_ids = await get_sample_app_ids(session, max_games=50000)
+                else:
+                    app_ids = await get_sample_app_ids(session, max_games=max_candidates)
+                app_ids = [aid for aid in app_ids if aid not in written_ids]
+
+                if sample_mode == "random":
+                    k = len(app_ids) if max_candidates == -1 else min(len(app_ids), max_candidates)
+                    app_ids = random.sample(app_ids, k)
+
+                for start in range(0, len(app_ids), window):
+                    if sample_mode == "random" and n_written >= target_n:
+                        break
+
+                    chunk = app_ids[start:start + window]
+
+                    if sample_mode == "top":
+                        # fetch_owners_proxy returns None when the request
+                        # fails; only unexpected errors (such as a failed
+                        # cache write) are raised and end up here.
+                        owners = await asyncio.gather(
+                            *(fetch_owners_proxy(session, aid) for aid in chunk),
+                            return_exceptions=True,
+                        )
+                        owners_by_id = {}
+                        for aid, value in zip(chunk, owners):
+                            if isinstance(value, BaseException):
+                                print(f"Unexpected SteamSpy error for app {aid}: {value!r}")
+                                value = None
+                            owners_by_id[aid] = value
+                        if len(heap) >= target_n:
+                            floor = heap[0][0]
+                            chunk = [aid for aid in chunk if (owners_by_id[aid] or 0) >= floor]
+                        if not chunk:
+                            continue
+
+                    details_maps = await asyncio.gather(
+                        *(fetch_details(session, batch)
+                          for batch in _batched(chunk, APPDETAILS_BATCH_SIZE))
+                    )
+                    details_by_id: Dict[int, Dict[str, Any]] = {
+                        aid: details
+                        for details_map in details_maps
+                        for aid, details in details_map.items()
+                        if details
+                    }
+                    survivors = _filter_details(details_by_id, min_year, target_main_genre, free_only)
+                    if sample_mode == "random":
+                        # Only request reviews/owners for as many games as
+                        # are still needed to reach target_n.
+                        survivors = survivors[:target_n - n_written]
+                    rows = await asyncio.gather(
+                        *(evaluate_app(session, aid, details_by_id[aid]) for aid in survivors)
+                    )
+                    for row in rows:
+                        if not row:
+                            continue
+                        if sample_mode == "random" and n_written >= target_n:
+                            break
+                        sink.write(orjson.dumps(row) + b"\n")
+                        n_written += 1
+                        if sample_mode == "top":
+                            push_top(row)
+                        elif row_queue is not None:
+                            row_queue.put_nowait(row)
+                    sink.flush()
+
+        if n_written == 0:
+            print("No games matched the given filters. Nothing will be saved.")
+            _write_json_array([], output_path)
+            os.remove(jsonl_path)
+            return
 
-        candidates = sorted(candidates, key=popularity_key, reverse=True)
+        if sample_mode == "top":
+            ranked = heapq.nlargest(target_n, heap)
+            candidates = _select_jsonl_lines(jsonl_path, [key[2] for key in ranked])
+        else:
+            candidates = list(_iter_jsonl_lines(jsonl_path))
 
-    if len(candidates) > target_n:
-        if sample_mode == "random":
-            random.shuffle(candidates)
+        # "random" candidates are already in random order (app_ids was
+        # sampled) and capped at target_n when written.
         candidates = candidates[:target_n]
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(candidates, f, ensure_ascii=False, indent=2)
+        saved = _write_json_array(candidates, output_path)
+        os.remove(jsonl_path)
 
-    print(f"Saved {len(candidates)} filtered games to {output_path}")
+        if sample_mode == "top" and row_queue is not None:
+            for line in candidates:
+                row_queue.put_nowait(orjson.loads(line))
 
+        print(f"Saved {saved} filtered games to {output_path}")
+    finally:
+        if row_queue is not None:
+            row_queue.put_nowait(None)
 
-def parse_filter_config(
-    config: Tuple[Any, ...],
-    default_target_n: int = 500,
-) -> Dict[str, Any]:
+
+def _parse_int(value: Any, message: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(message)
+
+
+@dataclass(slots=True, frozen=True)
+class FilterConfig:
     '''
-    Parse a compact configuration tuple into keyword arguments for
-    fetch_filtered_games.
-
-    Expected format of config:
-    (target_n, min_year, price_flag, sample_mode_flag, genre_string, max_candidates)
-
-    - target_n: desired sample size. If it is 0, empty or None, the
-      default_target_n value is used instead.
-    - min_year: integer year; 0 or None means no lower bound.
-    - price_flag: 0 = no restriction; 1 = free games only;
-      2 = paid games only.
-    - sample_mode_flag: 0 = "random"; 1 = "top".
-    - genre_string: target main genre; an empty string or None means
-      no genre restriction.
-    - max_candidates semantics:
-      * -1: no soft upper bound, scan as many app ids as the app list
-        endpoint returns (up to an internal cap) until target_n games
-        are collected or the list is exhausted.
-      * 0 / empty / None: use an automatic soft upper bound based on
-        target_n and the sampling mode.
-      * > 0: user-specified soft upper bound.
-
-    The function returns a dictionary containing target_n, min_year,
-    target_main_genre, free_only, sample_mode and max_candidates, which
-    can be unpacked directly into fetch_filtered_games.
-    '''
-    if len(config) == 5:
-        raw_target_n, raw_min_year, price_flag, sample_flag, raw_genre = config
-        raw_max_candidates = None
-    elif len(config) == 6:
-        raw_target_n, raw_min_year, price_flag, sample_flag, raw_genre, raw_max_candidates = config
-    else:
-        raise ValueError("config must have 5 or 6 elements")
-
-    if raw_target_n in (None, 0, "", "0"):
-        target_n = default_target_n
-    else:
-        try:
-            target_n = int(raw_target_n)
-        except ValueError:
-            raise ValueError("target_n must be an integer or 0")
-        if target_n <= 0:
+    Validated keyword arguments for fetch_filtered_games, built from the
+    compact configuration tuple with FilterConfig.from_tuple.
+    '''
+    target_n: int
+    min_year: Optional[int]
+    target_main_genre: Optional[str]
+    free_only: Optional[bool]
+    sample_mode: str
+    max_candidates: int
+    fetch_owners: bool = True
+
+    @classmethod
+    def from_tuple(
+        cls,
+        config: Tuple[Any, ...],
+        default_target_n: int = 500,
+    ) -> "FilterConfig":
+        '''
+        Parse and validate a compact configuration tuple.
+
+        Expected format of config:
+        (target_n, min_year, price_flag, sample_mode_flag, genre_string, max_candidates, owners_flag)
+
+        - target_n: desired sample size. If it is 0, empty or None, the
+          default_target_n value is used instead.
+        - min_year: integer year; 0 or None means no lower bound.
+        - price_flag: 0 = no restriction; 1 = free games only;
+          2 = paid games only.
+        - sample_mode_flag: 0 = "random"; 1 = "top".
+        - genre_string: target main genre; an empty string or None means
+          no genre restriction.
+        - max_candidates semantics:
+          * -1: no soft upper bound, scan as many app ids as the app list
+            endpoint returns (up to an internal cap) until target_n games
+            are collected or the list is exhausted.
+          * 0 / empty / None: use an automatic soft upper bound based on
+            target_n and the sampling mode.
+          * > 0: user-specified soft upper bound.
+        - owners_flag: 1 = query SteamSpy for owners_proxy; 0 = skip it.
+          0 is only accepted with sample_mode_flag 0 ("random"), since
+          "top" mode ranks by owners_proxy.
+
+        The trailing max_candidates and owners_flag elements may be
+        omitted (5- or 6-element tuple); owners_flag defaults to 1.
+        Raise ValueError if the tuple or any element is invalid.
+        '''
+        if len(config) not in (5, 6, 7):
+            raise ValueError("config must have 5, 6 or 7 elements")
+        raw_target_n, raw_min_year, price_flag, sample_flag, raw_genre = config[:5]
+        raw_max_candidates = config[5] if len(config) > 5 else None
+        owners_flag = config[6] if len(config) > 6 else 1
+
+        if raw_target_n in (None, 0, "", "0"):
             target_n = default_target_n
+        else:
+            target_n = _parse_int(raw_target_n, "target_n must be an integer or 0")
+            if target_n <= 0:
+                target_n = default_target_n
 
-    if raw_min_year in (None, 0, ""):
         min_year: Optional[int] = None
-    else:
-        try:
-            min_year = int(raw_min_year)
-        except ValueError:
-            raise ValueError("min_year must be an integer or 0")
-
-    if price_flag == 0:
-        free_only: Optional[bool] = None
-    elif price_flag == 1:
-        free_only = True
-    elif price_flag == 2:
-        free_only = False
-    else:
-        raise ValueError("price_flag must be 0 (no), 1 (free only), or 2 (paid only)")
-
-    if sample_flag == 0:
-        sample_mode = "random"
-    elif sample_flag == 1:
-        sample_mode = "top"
-    else:
-        raise ValueError("sample_mode_flag must be 0 (random) or 1 (top)")
-
-    if raw_genre is None:
-        genre_str = ""
-    else:
-        genre_str = str(raw_genre).strip()
-
-    target_main_genre: Optional[str] = genre_str or None
-
-    if raw_max_candidates in (None, "", "0", 0):
-        if sample_mode == "top":
-            max_candidates = max(target_n * 5, 2000)
+        if raw_min_year not in (None, 0, ""):
+            min_year = _parse_int(raw_min_year, "min_year must be an integer or 0")
+
+        free_only: Optional[bool]
+        if price_flag == 0:
+            free_only = None
+        elif price_flag == 1:
+            free_only = True
+        elif price_flag == 2:
+            free_only = False
         else:
-            max_candidates = target_n * 2
-    else:
-        try:
-            max_candidates_parsed = int(raw_max_candidates)
-        except ValueError:
-            raise ValueError("max_candidates must be an integer or 0/-1")
-        if max_candidates_parsed == -1:
-            max_candidates = -1
-        elif max_candidates_parsed <= 0:
-            max_candidates = max(target_n * 10, 2000)
+            raise ValueError("price_flag must be 0 (no), 1 (free only), or 2 (paid only)")
+
+        if sample_flag == 0:
+            sample_mode = "random"
+        elif sample_flag == 1:
+            sample_mode = "top"
+        else:
+            raise ValueError("sample_mode_flag must be 0 (random) or 1 (top)")
+
+        if owners_flag == 1:
+            fetch_owners = True
+        elif owners_flag == 0:
+            if sample_mode != "random":
+                raise ValueError("owners_flag=0 is only valid with sample_mode_flag 0 (random)")
+            fetch_owners = False
         else:
-            max_candidates = max_candidates_parsed
+            raise ValueError("owners_flag must be 0 (skip SteamSpy) or 1 (fetch owners)")
 
-    params: Dict[str, Any] = {
-        "target_n": target_n,
-        "min_year": min_year,
-        "target_main_genre": target_main_genre,
-        "free_only": free_only,
-        "sample_mode": sample_mode,
-        "max_candidates": max_candidates,
-    }
-    return params
+        genre_str = "" if raw_genre is None else str(raw_genre).strip()
+        target_main_genre: Optional[str] = genre_str or None
+
+        if raw_max_candidates in (None, "", "0", 0):
+            if sample_mode == "top":
+                max_candidates = max(target_n * 5, 2000)
+            else:
+                max_candidates = target_n * 2
+        else:
+            max_candidates = _parse_int(raw_max_candidates, "max_candidates must be an integer or 0/-1")
+            if max_candidates != -1 and max_candidates <= 0:
+                max_candidates = max(target_n * 10, 2000)
+
+        return cls(
+            target_n=target_n,
+            min_year=min_year,
+            target_main_genre=target_main_genre,
+            free_only=free_only,
+            sample_mode=sample_mode,
+            max_candidates=max_candidates,
+            fetch_owners=fetch_owners,
+        )
+
+
+def parse_tuple_input(raw: str) -> Tuple[Any, ...]:
+    '''
+    Parse the raw string typed by the user into a configuration tuple.
+    The expected format is a Python-style tuple or list, such as
+    (500, 0, 0, 0, "", 0). Used by the command-line entry points of both
+    Data_collection and Data_cleaning.
+    '''
+    try:
+        value = ast.literal_eval(raw)
+    except Exception as e:
+        raise ValueError(f"Could not parse input as a tuple: {e}")
+
+    if isinstance(value, list):
+        value = tuple(value)
+
+    if not isinstance(value, tuple):
+        raise ValueError("Input must be a tuple or list.")
+
+    if len(value) not in (5, 6, 7):
+        raise ValueError("Config must have 5, 6 or 7 elements.")
+
+    return value
+
+
+def parse_filter_config(
+    config: Tuple[Any, ...],
+    default_target_n: int = 500,
+) -> Dict[str, Any]:
+    '''
+    Parse a compact configuration tuple (see FilterConfig.from_tuple for
+    the format) into a dictionary containing target_n, min_year,
+    target_main_genre, free_only, sample_mode, max_candidates and
+    fetch_owners, which can be unpacked directly into fetch_filtered_games.
+    '''
+    return asdict(FilterConfig.from_tuple(config, default_target_n))
+
+
+_T = TypeVar("_T")
+
+
+def run_async(main: Coroutine[Any, Any, _T]) -> _T:
+    '''
+    Run main to completion on a new event loop and return its result,
+    using uvloop except on Windows, where it is not available. On Python
+    3.12+ uvloop.run is used, since uvloop.install is deprecated there.
+    '''
+    if sys.platform == "win32":
+        return asyncio.run(main)
+
+    import uvloop
+    if sys.version_info >= (3, 12):
+        return uvloop.run(main)
+    uvloop.install()
+    return asyncio.run(main)
 
 
-def run_from_config(
+async def run_from_config(
     config: Tuple[Any, ...],
     output_path: str,
 ) -> None:
@@ -469,5 +1380,5 @@ def run_from_config(
     output path, then calls fetch_filtered_games with the corresponding
     parameters parsed from the tuple.
     '''
-    params = parse_filter_config(config)
-    fetch_filtered_games(output_path=output_path, **params)
+    params = FilterConfig.from_tuple(config)
+    await fetch_filtered_games(output_path=output_path, **asdict(params))
@@ -1,30 +1,4 @@
-import ast
-from typing import Any, Tuple
-
-from fetch_raw_data import run_from_config
-
-
-def parse_tuple_input(raw: str) -> Tuple[Any, ...]:
-    '''
-    Parse the raw string typed by the user into a configuration tuple.
-    The expected format is a Python-style tuple or list, such as
-    (500, 0, 0, 0, "", 0).
-    '''
-    try:
-        value = ast.literal_eval(raw)
-    except Exception as e:
-        raise ValueError(f"Could not parse input as a tuple: {e}")
-
-    if isinstance(value, list):
-        value = tuple(value)
-
-    if not isinstance(value, tuple):
-        raise ValueError("Input must be a tuple or list.")
-
-    if len(value) not in (5, 6):
-        raise ValueError("Config must have 5 or 6 elements.")
-
-    return value
+from fetch_raw_data import parse_tuple_input, run_async, run_from_config
 
 
 def main() -> None:
@@ -35,7 +9,8 @@ def main() -> None:
     print(
         "=== Steam game data collector (config mode) ===\n"
         "Config format:\n"
-        "  (target_n, min_year, price_flag, sample_mode_flag, genre_string, max_candidates)\n"
+        "  (target_n, min_year, price_flag, sample_mode_flag, genre_string, max_candidates[, owners_flag])\n"
+        "  owners_flag: 1 = fetch SteamSpy owners (default), 0 = skip (random mode only)\n"
         "Example:\n"
         '  (500, 0, 0, 1, "", 0)\n'
     )
@@ -46,7 +21,7 @@ def main() -> None:
     output_path = "Rawdata/games_filtered.json"
 
     print("Working... collecting data from Steam API based on your config.\n")
-    run_from_config(config, output_path)
+    run_async(run_from_config(config, output_path))
 
     print(f"Done. Saved filtered games to {output_path}")
 